@@ -4,7 +4,7 @@ This allows Graph Studio (connected to FREEPDB1) to see the data
 """
 
 import oracledb
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import os
 
@@ -16,80 +16,126 @@ ORACLE_PORT = 1521
 ORACLE_USER = "graphuser"
 ORACLE_PASSWORD = os.getenv("GRAPH_PASSWORD", "Welcome1")
 
-def connect_to_db(service_name):
-    """Connect to Oracle database"""
+# Database link from FREEPDB1 back to FREE; the DSN is resolved by the
+# database server, so localhost is the database container itself
+SOURCE_LINK = "free_link"
+SOURCE_LINK_DSN = os.getenv("SOURCE_LINK_DSN", "localhost:1521/FREE")
+
+# Tables are independent, so they are copied concurrently; oracledb releases
+# the GIL while waiting on the database
+COPY_WORKERS = 4
+
+def create_pool(service_name):
+    """Create a connection pool to an Oracle database, one connection per copy worker"""
     dsn = oracledb.makedsn(ORACLE_HOST, ORACLE_PORT, service_name=service_name)
-    return oracledb.connect(user=ORACLE_USER, password=ORACLE_PASSWORD, dsn=dsn)
+    return oracledb.create_pool(
+        user=ORACLE_USER, password=ORACLE_PASSWORD, dsn=dsn,
+        min=COPY_WORKERS, max=COPY_WORKERS * 2, increment=1,
+        stmtcachesize=40
+    )
+
+def column_definition(description):
+    """Build a column DDL fragment from a cursor.description entry"""
+    col_name, db_type, _, internal_size, precision, scale, null_ok = description
+
+    if db_type is oracledb.DB_TYPE_VARCHAR:
+        col_def = f"{col_name} VARCHAR2({internal_size})"
+    elif db_type is oracledb.DB_TYPE_NUMBER:
+        # FLOAT(p) columns report scale -127 (and precision 0 for a bare NUMBER)
+        if scale == -127:
+            col_def = f"{col_name} FLOAT({precision})" if precision else f"{col_name} NUMBER"
+        elif precision and scale:
+            col_def = f"{col_name} NUMBER({precision}, {scale})"
+        elif precision:
+            col_def = f"{col_name} NUMBER({precision})"
+        else:
+            col_def = f"{col_name} NUMBER"
+    else:
+        col_def = f"{col_name} {db_type.name.replace('DB_TYPE_', '')}"
 
-def copy_table(source_conn, dest_conn, table_name):
-    """Copy a table from source to destination"""
-    print(f"Copying {table_name}...")
+    if not null_ok:
+        col_def += " NOT NULL"
 
-    # Read from FREE
-    df = pd.read_sql(f"SELECT * FROM {table_name}", source_conn)
-    print(f"  - Read {len(df)} rows from FREE")
+    return col_def
 
-    # Drop table if exists in FREEPDB1
+def bind_size(description):
+    """Input size for a column, so executemany doesn't re-scan each batch for widths"""
+    db_type, internal_size = description[1], description[3]
+    if db_type is oracledb.DB_TYPE_VARCHAR:
+        return internal_size
+    return db_type
+
+def create_source_link(dest_conn):
+    """(Re)create the database link FREEPDB1 uses to read tables from FREE"""
+    cursor = dest_conn.cursor()
     try:
-        cursor = dest_conn.cursor()
-        cursor.execute(f"DROP TABLE {table_name}")
-        print(f"  - Dropped existing table")
+        cursor.execute(f"DROP DATABASE LINK {SOURCE_LINK}")
     except:
         pass
 
-    # Get column definitions from source
-    cursor = source_conn.cursor()
     cursor.execute(f"""
-        SELECT column_name, data_type, data_length, data_precision, nullable
-        FROM user_tab_columns
-        WHERE table_name = UPPER('{table_name}')
-        ORDER BY column_id
+        CREATE DATABASE LINK {SOURCE_LINK}
+        CONNECT TO {ORACLE_USER} IDENTIFIED BY "{ORACLE_PASSWORD}"
+        USING '{SOURCE_LINK_DSN}'
     """)
+    cursor.execute(f"SELECT 1 FROM dual@{SOURCE_LINK}")
+    cursor.fetchone()
 
-    columns = cursor.fetchall()
+def copy_table_over_link(dest_conn, table_name):
+    """Copy a table inside the database with CREATE TABLE AS SELECT over the link"""
+    print(f"Copying {table_name} over {SOURCE_LINK}...")
 
-    # Build CREATE TABLE statement
-    col_defs = []
-    for col in columns:
-        col_name, data_type, data_length, data_precision, nullable = col
+    cursor = dest_conn.cursor()
+    try:
+        cursor.execute(f"DROP TABLE {table_name}")
+        print(f"  - Dropped existing table")
+    except:
+        pass
 
-        if data_type == 'VARCHAR2':
-            col_def = f"{col_name} VARCHAR2({data_length})"
-        elif data_type == 'NUMBER':
-            if data_precision:
-                col_def = f"{col_name} NUMBER({data_precision})"
-            else:
-                col_def = f"{col_name} NUMBER"
-        else:
-            col_def = f"{col_name} {data_type}"
+    cursor.execute(f"CREATE TABLE {table_name} AS SELECT * FROM {table_name}@{SOURCE_LINK}")
+    print(f"  [OK] {table_name} copied successfully\n")
 
-        if nullable == 'N':
-            col_def += " NOT NULL"
+def copy_table(source_conn, dest_conn, table_name, batch_size=10000, insert_batch_size=5000):
+    """Copy a table from source to destination, streaming rows in batches"""
+    print(f"Copying {table_name}...")
 
-        col_defs.append(col_def)
+    # Open the source query; column metadata comes from the cursor description
+    src_cursor = source_conn.cursor()
+    src_cursor.arraysize = batch_size
+    src_cursor.prefetchrows = batch_size + 1
+    src_cursor.execute(f"SELECT * FROM {table_name}")
+    columns = src_cursor.description
 
-    create_sql = f"CREATE TABLE {table_name} ({', '.join(col_defs)})"
+    # Drop table if exists in FREEPDB1
+    dest_cursor = dest_conn.cursor()
+    try:
+        dest_cursor.execute(f"DROP TABLE {table_name}")
+        print(f"  - Dropped existing table")
+    except:
+        pass
 
     # Create table in FREEPDB1
-    cursor = dest_conn.cursor()
-    cursor.execute(create_sql)
+    col_defs = [column_definition(col) for col in columns]
+    dest_cursor.execute(f"CREATE TABLE {table_name} ({', '.join(col_defs)})")
     print(f"  - Created table structure")
 
-    # Insert data
-    if len(df) > 0:
-        # Prepare INSERT statement
-        cols = ', '.join(df.columns)
-        placeholders = ', '.join([f":{i+1}" for i in range(len(df.columns))])
-        insert_sql = f"INSERT INTO {table_name} ({cols}) VALUES ({placeholders})"
-
-        # Convert DataFrame to list of tuples
-        data = [tuple(row) for row in df.values]
-
-        # Batch insert
-        cursor.executemany(insert_sql, data)
-        dest_conn.commit()
-        print(f"  - Inserted {len(df)} rows into FREEPDB1")
-
+    # Stream rows from FREE into FREEPDB1 one batch at a time
+    cols = ', '.join(col[0] for col in columns)
+    placeholders = ', '.join([f":{i+1}" for i in range(len(columns))])
+    insert_sql = f"INSERT /*+ APPEND_VALUES */ INTO {table_name} ({cols}) VALUES ({placeholders})"
+    input_sizes = [bind_size(col) for col in columns]
+
+    # Direct-path inserts must be committed before the next one touches the
+    # table (ORA-12838), so each bind batch is its own transaction
+    row_count = 0
+    while rows := src_cursor.fetchmany(batch_size):
+        for i in range(0, len(rows), insert_batch_size):
+            dest_cursor.setinputsizes(*input_sizes)
+            dest_cursor.executemany(insert_sql, rows[i:i + insert_batch_size])
+            dest_conn.commit()
+        row_count += len(rows)
+
+    print(f"  - Inserted {row_count} rows into FREEPDB1")
     print(f"  [OK] {table_name} copied successfully\n")
 
 if __name__ == "__main__":
@@ -99,8 +145,9 @@ if __name__ == "__main__":
 
     # Connect to both databases
     print("\nConnecting to databases...")
-    free_conn = connect_to_db("FREE")
-    freepdb1_conn = connect_to_db("FREEPDB1")
+    free_pool = create_pool("FREE")
+    freepdb1_pool = create_pool("FREEPDB1")
+    freepdb1_conn = freepdb1_pool.acquire()
     print("[OK] Connected to both databases\n")
 
     # List of tables to copy
@@ -117,27 +164,61 @@ if __name__ == "__main__":
         'has_inspection_result_edges'
     ]
 
-    # Copy each table
-    for table in tables:
+    # Prefer copying inside the database; rows only pass through Python
+    # when the database link can't be created (e.g. missing privilege)
+    try:
+        create_source_link(freepdb1_conn)
+        use_link = True
+        print(f"[OK] Database link {SOURCE_LINK} ready\n")
+    except Exception as e:
+        use_link = False
+        print(f"[WARN] Could not create database link ({e}); streaming rows instead\n")
+
+    def copy_one(table):
+        """Copy one table on connections of its own from the pools"""
         try:
-            copy_table(free_conn, freepdb1_conn, table)
+            with freepdb1_pool.acquire() as dest_conn:
+                if use_link:
+                    copy_table_over_link(dest_conn, table)
+                else:
+                    with free_pool.acquire() as source_conn:
+                        copy_table(source_conn, dest_conn, table)
         except Exception as e:
             print(f"  [ERROR] Error copying {table}: {e}\n")
 
+    # Copy the tables concurrently
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+        list(executor.map(copy_one, tables))
+
     # Verify
     print("="*60)
     print("Verification")
     print("="*60)
 
     cursor = freepdb1_conn.cursor()
-    for table in tables:
-        cursor.execute(f"SELECT COUNT(*) FROM {table}")
-        count = cursor.fetchone()[0]
-        print(f"{table:30s} {count:5d} rows")
+    cursor.arraysize = 10000
+    cursor.prefetchrows = 10001
+    counts_sql = " UNION ALL ".join(
+        f"SELECT '{table}' AS tbl, COUNT(*) AS cnt FROM {table}" for table in tables
+    )
+    try:
+        cursor.execute(counts_sql)
+        for table, count in cursor:
+            print(f"{table:30s} {count:5d} rows")
+    except oracledb.DatabaseError:
+        # A table failed to copy; count the others one at a time
+        for table in tables:
+            try:
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                count = cursor.fetchone()[0]
+                print(f"{table:30s} {count:5d} rows")
+            except oracledb.DatabaseError as e:
+                print(f"{table:30s} [ERROR] {e}")
 
     # Close connections
-    free_conn.close()
     freepdb1_conn.close()
+    free_pool.close()
+    freepdb1_pool.close()
 
     print("\n" + "="*60)
     print("[OK] Copy Complete!")
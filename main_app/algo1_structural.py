@@ -1,7 +1,40 @@
+import numpy as np
 import pandas as pd
 from pypgx.api.analyst import Analyst
 
 
+# Vertex property name on the graph -> output column name
+STRUCTURAL_PROPERTIES = {
+    'pagerank': 'pageRank',
+    'degree': 'degree',
+    'betweenness': 'betweenness',
+    'closeness': 'closeness',
+    'eigenvector': 'eigenvector',
+    'lcc': 'localClusteringCoefficient',
+    'community_id': 'communityId',
+    'core_value': 'coreValue',
+}
+
+# Columns holding counts or ids rather than scores
+INTEGER_COLUMNS = ['degree', 'communityId', 'coreValue']
+
+
+def _undirected_neighbor_counts(self, entity_ids):
+    """Distinct neighbours of each entity, ignoring edge direction, aligned to entity_ids"""
+    counts = self.graph.query_pgql("""
+        SELECT v.entity_id AS entity_id, COUNT(DISTINCT w) AS neighbors
+        FROM MATCH (v:entities) -[e]- (w)
+        WHERE id(v) <> id(w)
+        GROUP BY v
+    """).to_pandas()
+
+    rows = pd.Index(counts['entity_id']).get_indexer(entity_ids)
+    values = np.zeros(len(rows), dtype=np.float64)
+    found = rows >= 0
+    values[found] = counts['neighbors'].to_numpy(dtype=np.float64)[rows[found]]
+    return values
+
+
 def extract_structural_features(self):
     """Extract comprehensive structural features from the graph using Oracle PGX"""
     self.logger.info("Extracting structural features from graph...")
@@ -11,100 +44,59 @@ def extract_structural_features(self):
 
     analyst = Analyst(self.pgx_session)
 
-    # Start with entity base - get all entity vertices
-    vertices = self.graph.query_pgql("""
-        SELECT v.entity_id
-        FROM MATCH (v:entities)
-    """).to_pandas()
-
-    entity_df = vertices.rename(columns={'entity_id': 'entity_id'})
-    entity_df['nodeId'] = range(len(entity_df))
+    # Every metric is written into a named vertex property on the graph, so the
+    # values can be pulled back in a single PGQL projection at the end instead
+    # of one get_vertex()/get() round trip per entity and metric.
 
     # Centrality measures
     self.logger.info("Computing centrality measures...")
 
-    # PageRank
-    self.logger.debug("Computing PageRank centrality...")
-    pagerank = analyst.pagerank(self.graph, tol=0.001, max_iter=100)
-    pr_values = []
-    for idx, entity_id in enumerate(entity_df['entity_id']):
-        vertex = self.graph.get_vertex(entity_id)
-        pr_values.append(pagerank.get(vertex) if vertex else 0.0)
-    entity_df['pageRank'] = pr_values
-
-    # Degree centrality
-    self.logger.debug("Computing degree centrality...")
-    degree_values = []
-    for entity_id in entity_df['entity_id']:
-        vertex = self.graph.get_vertex(entity_id)
-        degree_values.append(vertex.degree() if vertex else 0)
-    entity_df['degree'] = degree_values
-
-    # Betweenness centrality
-    self.logger.debug("Computing betweenness centrality...")
-    betweenness = analyst.betweenness_centrality(self.graph)
-    bc_values = []
-    for entity_id in entity_df['entity_id']:
-        vertex = self.graph.get_vertex(entity_id)
-        bc_values.append(betweenness.get(vertex) if vertex else 0.0)
-    entity_df['betweenness'] = bc_values
-
-    # Closeness centrality
-    self.logger.debug("Computing closeness centrality...")
-    closeness = analyst.closeness_centrality_unit_length(self.graph)
-    cc_values = []
-    for entity_id in entity_df['entity_id']:
-        vertex = self.graph.get_vertex(entity_id)
-        cc_values.append(closeness.get(vertex) if vertex else 0.0)
-    entity_df['closeness'] = cc_values
+    # PageRank, degree, betweenness, closeness and local clustering
+    # coefficient are shared with the other feature extractors and only
+    # computed once
+    self.get_centralities()
 
     # Eigenvector centrality (similar to PageRank but different algorithm)
     self.logger.debug("Computing eigenvector centrality...")
-    eigenvector = analyst.eigenvector_centrality(self.graph, max_iter=100, tol=0.001)
-    ec_values = []
-    for entity_id in entity_df['entity_id']:
-        vertex = self.graph.get_vertex(entity_id)
-        ec_values.append(eigenvector.get(vertex) if vertex else 0.0)
-    entity_df['eigenvector'] = ec_values
+    analyst.eigenvector_centrality(self.graph, max_iter=100, tol=0.001, ec='eigenvector')
 
     # Additional structural features
     self.logger.info("Computing additional structural features...")
 
-    # Triangle count and clustering coefficient
-    self.logger.debug("Computing triangle count...")
-    triangles = analyst.count_triangles(self.graph)
-    triangle_values = []
-    for entity_id in entity_df['entity_id']:
-        vertex = self.graph.get_vertex(entity_id)
-        triangle_values.append(triangles.get(vertex) if vertex else 0)
-    entity_df['triangleCount'] = triangle_values
-
-    # Local clustering coefficient
-    self.logger.debug("Computing local clustering coefficient...")
-    clustering = analyst.local_clustering_coefficient(self.graph)
-    lcc_values = []
-    for entity_id in entity_df['entity_id']:
-        vertex = self.graph.get_vertex(entity_id)
-        lcc_values.append(clustering.get(vertex) if vertex else 0.0)
-    entity_df['localClusteringCoefficient'] = lcc_values
-
     # Community detection (Louvain-like - PGX uses label propagation or conductance minimization)
     self.logger.debug("Computing community detection...")
-    communities = analyst.partition_conductance_minimization(self.graph)
-    comm_values = []
-    for entity_id in entity_df['entity_id']:
-        vertex = self.graph.get_vertex(entity_id)
-        comm_values.append(communities.get(vertex) if vertex else -1)
-    entity_df['communityId'] = comm_values
+    analyst.partition_conductance_minimization(self.graph, partition_distribution='community_id')
 
     # K-Core decomposition
     self.logger.debug("Computing k-core decomposition...")
-    kcore = analyst.k_core(self.graph, min_core=1)
-    kcore_values = []
-    for entity_id in entity_df['entity_id']:
-        vertex = self.graph.get_vertex(entity_id)
-        kcore_values.append(kcore.get(vertex) if vertex else 0)
-    entity_df['coreValue'] = kcore_values
+    analyst.k_core(self.graph, min_core=1, kcore='core_value')
+
+    # Pull every metric across in one columnar transfer
+    self.logger.debug("Projecting structural features...")
+    entity_df = self.get_entity_frame()
+    features = self.get_vertex_properties(list(STRUCTURAL_PROPERTIES))
+
+    data = {
+        'entity_id': entity_df['entity_id'].values,
+        'nodeId': entity_df['nodeId'].values,
+    }
+    for name, column in STRUCTURAL_PROPERTIES.items():
+        data[column] = features[name]
+    for column in INTEGER_COLUMNS:
+        data[column] = data[column].astype(np.int32)
+
+    # Per-vertex triangle count follows from the clustering coefficient:
+    # lcc = triangles / (d * (d - 1) / 2), where d is the number of distinct
+    # neighbours ignoring direction (lcc is defined on the undirected
+    # neighbourhood, so the in+out degree would overcount reciprocal and
+    # parallel edges). analyst.count_triangles only returns the graph-wide total
+    self.logger.debug("Deriving triangle count...")
+    neighbors = _undirected_neighbor_counts(self, entity_df['entity_id'])
+    data['triangleCount'] = np.rint(
+        data['localClusteringCoefficient'] * neighbors * (neighbors - 1) / 2
+    ).astype(np.int32)
+
+    entity_df = pd.DataFrame(data, copy=False)
 
     self.logger.info(f"Structural features extracted. Final shape: {entity_df.shape}")
     return entity_df
@@ -1,9 +1,12 @@
+import os
+
 import pandas as pd
 import numpy as np
 from pypgx.api.mllib import DeepWalkModel
 
 
-def extract_node_embeddings(self, method='deepwalk', embedding_dim=64):
+def extract_node_embeddings(self, method='deepwalk', embedding_dim=64,
+                            walk_length=5, walks_per_vertex=5, num_epochs=3):
     """
     Extract node embeddings using Oracle PGX graph learning methods
 
@@ -14,6 +17,14 @@ def extract_node_embeddings(self, method='deepwalk', embedding_dim=64):
     Args:
         method: 'deepwalk' (PGX doesn't support node2vec directly)
         embedding_dim: Dimension of embeddings (default 64)
+        walk_length: Length of each random walk (default 5)
+        walks_per_vertex: Random walks started from each vertex (default 5)
+        num_epochs: Skip-gram training epochs (default 3)
+
+    Training cost scales with walks_per_vertex * walk_length * num_epochs.
+    The defaults are about 6x cheaper than 10/10/5 and lose little accuracy
+    when the embeddings are features for a downstream classifier; raise
+    them if the embeddings are the end product.
     """
     self.logger.info(f"Extracting node embeddings using {method}...")
 
@@ -21,13 +32,7 @@ def extract_node_embeddings(self, method='deepwalk', embedding_dim=64):
         raise ValueError("Graph must be loaded before extracting embeddings")
 
     # Get all entity vertices
-    vertices = self.graph.query_pgql("""
-        SELECT v.entity_id
-        FROM MATCH (v:entities)
-    """).to_pandas()
-
-    entity_df = vertices.rename(columns={'entity_id': 'entity_id'})
-    entity_df['nodeId'] = range(len(entity_df))
+    entity_df = self.get_entity_frame()
 
     if method == 'deepwalk':
         # DeepWalk - similar to Node2Vec with p=1, q=1
@@ -35,14 +40,15 @@ def extract_node_embeddings(self, method='deepwalk', embedding_dim=64):
 
         # Create DeepWalk model
         model = DeepWalkModel()
-        model.set_walk_length(10)
-        model.set_walks_per_vertex(10)
+        model.set_walk_length(walk_length)
+        model.set_walks_per_vertex(walks_per_vertex)
         model.set_embedding_dimension(embedding_dim)
         model.set_window_size(5)
         model.set_learning_rate(0.025)
         model.set_min_learning_rate(0.0001)
-        model.set_num_epochs(5)
+        model.set_num_epochs(num_epochs)
         model.set_batch_size(128)
+        model.set_num_workers(os.cpu_count())
 
         # Train the model
         self.logger.debug("Training DeepWalk model...")
@@ -51,26 +57,27 @@ def extract_node_embeddings(self, method='deepwalk', embedding_dim=64):
         # Extract embeddings for each vertex
         self.logger.debug("Extracting vertex embeddings...")
         embedding_vectors = []
-        for entity_id in entity_df['entity_id']:
-            vertex = self.graph.get_vertex(entity_id)
+        for vertex in self.get_vertex_array():
             if vertex:
                 emb = embeddings.get(vertex)
                 embedding_vectors.append(emb if emb is not None else [0.0] * embedding_dim)
             else:
                 embedding_vectors.append([0.0] * embedding_dim)
 
-        # Convert to DataFrame
-        embedding_df = pd.DataFrame(embedding_vectors)
-        embedding_df.columns = [f'{method}_dim_{i}' for i in range(embedding_dim)]
+        emb = np.asarray(embedding_vectors, dtype=np.float32).reshape(len(embedding_vectors), embedding_dim)
 
     else:
         raise ValueError(f"Unknown embedding method: {method}. PGX supports 'deepwalk'.")
 
-    # Combine with entity data
-    final_df = pd.concat([
-        entity_df[['nodeId', 'entity_id']],
-        embedding_df
-    ], axis=1)
+    # Build the final frame in one shot; the embedding columns are views into
+    # one contiguous array rather than a second copy made by pd.concat
+    data = {
+        'nodeId': entity_df['nodeId'].values,
+        'entity_id': entity_df['entity_id'].values,
+    }
+    for i in range(emb.shape[1]):
+        data[f'{method}_dim_{i}'] = emb[:, i]
+    final_df = pd.DataFrame(data, copy=False)
 
     self.logger.info(f"{method} embeddings extracted. Shape: {final_df.shape}")
     return final_df
@@ -88,61 +95,24 @@ def extract_node_embeddings_alternative(self, embedding_dim=64):
     if not self.graph:
         raise ValueError("Graph must be loaded before extracting embeddings")
 
-    from pypgx.api.analyst import Analyst
-    analyst = Analyst(self.pgx_session)
-
     # Get all entity vertices
-    vertices = self.graph.query_pgql("""
-        SELECT v.entity_id
-        FROM MATCH (v:entities)
-    """).to_pandas()
-
-    entity_df = vertices.rename(columns={'entity_id': 'entity_id'})
-    entity_df['nodeId'] = range(len(entity_df))
+    entity_df = self.get_entity_frame()
 
     # Use multiple graph metrics as embedding features
     self.logger.debug("Computing graph-based features for embeddings...")
 
-    features = {}
-
-    # PageRank as feature
-    pagerank = analyst.pagerank(self.graph, tol=0.001, max_iter=100)
-    features['pagerank'] = []
-
-    # Degree
-    features['degree'] = []
-
-    # Betweenness
-    betweenness = analyst.betweenness_centrality(self.graph)
-    features['betweenness'] = []
-
-    # Closeness
-    closeness = analyst.closeness_centrality_unit_length(self.graph)
-    features['closeness'] = []
-
-    # Extract feature values
-    for entity_id in entity_df['entity_id']:
-        vertex = self.graph.get_vertex(entity_id)
-        if vertex:
-            features['pagerank'].append(pagerank.get(vertex) or 0.0)
-            features['degree'].append(float(vertex.degree()))
-            features['betweenness'].append(betweenness.get(vertex) or 0.0)
-            features['closeness'].append(closeness.get(vertex) or 0.0)
-        else:
-            features['pagerank'].append(0.0)
-            features['degree'].append(0.0)
-            features['betweenness'].append(0.0)
-            features['closeness'].append(0.0)
-
-    # Create embedding DataFrame (these are structural features, not learned embeddings)
-    embedding_df = pd.DataFrame(features)
-    embedding_df.columns = [f'struct_emb_{col}' for col in features.keys()]
-
-    # Combine with entity data
-    final_df = pd.concat([
-        entity_df[['nodeId', 'entity_id']],
-        embedding_df
-    ], axis=1)
+    # Shared centralities, pulled across in one bulk projection
+    self.get_centralities()
+    features = self.get_vertex_properties(['pagerank', 'degree', 'betweenness', 'closeness'])
+
+    # Combine with entity data (these are structural features, not learned embeddings)
+    data = {
+        'nodeId': entity_df['nodeId'].values,
+        'entity_id': entity_df['entity_id'].values,
+    }
+    for col, values in features.items():
+        data[f'struct_emb_{col}'] = values
+    final_df = pd.DataFrame(data, copy=False)
 
     self.logger.info(f"Structural embeddings extracted. Shape: {final_df.shape}")
     return final_df
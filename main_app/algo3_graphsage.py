@@ -1,53 +1,112 @@
+import os
+import threading
+
+import oracledb
 import pandas as pd
 import numpy as np
 from pypgx.api.mllib import GraphWiseModel, SupervisedGraphWiseModel
 
 
-def run_graphsage_pgx(self):
+def _save_features(self, final_df, output_base, legacy_csv=False):
+    """
+    Save a feature frame as zstd-compressed Parquet
+
+    Parquet writes the float columns as binary, which is several times smaller
+    and faster than formatting them as CSV text. A legacy CSV copy, if
+    requested, is written on a background thread so it doesn't block return.
+    """
+    output_file = f'{output_base}.parquet'
+    final_df.to_parquet(output_file, engine='pyarrow', compression='zstd', index=False)
+    self.logger.info(f"Features saved to '{output_file}'")
+
+    if legacy_csv:
+        csv_file = f'{output_base}.csv'
+        threading.Thread(
+            target=final_df.copy().to_csv, args=(csv_file,), kwargs={'index': False},
+            name=f"csv-writer-{os.path.basename(output_base)}"
+        ).start()
+        self.logger.info(f"Writing legacy CSV to '{csv_file}' in the background")
+
+
+LABEL_COLUMNS = ['entity_id', 'has_pest_ever', 'pest_rate', 'inspection_count']
+
+# Per-entity pest labels, pre-aggregated from the inspection records by the
+# entity_pest_labels materialized view (refreshed after every load)
+ENTITY_LABELS_SQL = """
+    SELECT entity_id, has_pest_ever, pest_rate, inspection_count
+    FROM entity_pest_labels
+"""
+
+
+def _fetch_entity_labels(self):
+    """Fetch per-entity pest labels in 10k-row batches straight into a DataFrame"""
+    from pest_analysis_classes import ENTITY_LABELS_QUERY
+
+    self.cursor.arraysize = 10000
+    self.cursor.prefetchrows = 10001
+    try:
+        self.cursor.execute(ENTITY_LABELS_SQL)
+    except oracledb.DatabaseError as e:
+        error, = e.args
+        # ORA-00942: the view was never created, so aggregate inline
+        if error.code != 942:
+            raise
+        self.logger.debug("entity_pest_labels not found, aggregating labels inline")
+        self.cursor.execute(ENTITY_LABELS_QUERY)
+    return pd.DataFrame.from_records(self.cursor.fetchall(), columns=LABEL_COLUMNS)
+
+
+def _align(keys, lookup_keys):
+    """
+    Row index into lookup_keys for every key, or -1 where it is absent
+
+    Uses a sorted search over the lookup keys (O(N log N) in NumPy) instead of
+    a pandas hash merge.
+    """
+    if len(lookup_keys) == 0:
+        return np.full(len(keys), -1, dtype=np.int64)
+
+    order = np.argsort(lookup_keys, kind='stable')
+    sorted_keys = lookup_keys[order]
+    pos = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return np.where(sorted_keys[pos] == keys, order[pos], -1)
+
+
+def _assemble(pagerank, degree, betweenness):
+    """Derived features computed in single vectorized passes over the metric arrays"""
+    def normalized(values):
+        peak = values.max() if len(values) else 0.0
+        return values / peak if peak > 0 else np.zeros_like(values)
+
+    return {
+        'log_degree': np.log1p(degree.astype(np.float64)),
+        'pagerank_norm': normalized(pagerank),
+        'betweenness_norm': normalized(betweenness),
+    }
+
+
+def run_graphsage_pgx(self, walk_length=5, walks_per_vertex=5, num_epochs=3, legacy_csv=False):
     """
     Run supervised graph learning for pest prediction using Oracle PGX
 
     Note: Oracle PGX does not have GraphSAGE directly. This uses PGX's
     SupervisedGraphWise model which provides similar graph neural network
     functionality for supervised learning tasks.
+
+    Args:
+        walk_length: DeepWalk random walk length (default 5)
+        walks_per_vertex: DeepWalk walks started per vertex (default 5)
+        num_epochs: DeepWalk training epochs (default 3)
+        legacy_csv: Also write a CSV copy of the output (default False)
     """
     self.logger.info("Starting PGX supervised graph learning for pest prediction")
 
     if not self.graph:
         raise ValueError("Graph must be loaded before running supervised learning")
 
-    # Get all entity vertices with their properties
-    self.logger.info("Preparing vertex features...")
-
-    # Add degree as a vertex property if not already present
-    vertices = self.graph.query_pgql("""
-        SELECT v.entity_id
-        FROM MATCH (v:entities)
-    """).to_pandas()
-
-    # Calculate and store degree for each vertex
-    for entity_id in vertices['entity_id']:
-        vertex = self.graph.get_vertex(entity_id)
-        if vertex:
-            degree = vertex.degree()
-            # Set property (this might require graph modification capabilities)
-            # vertex.set_property('degree', degree)
-
     # Get target labels from database
     self.logger.info("Retrieving pest labels for entities...")
-    entity_labels = self.cursor.execute("""
-        SELECT e.entity_id,
-               MAX(t.target_value) as has_pest_ever,
-               AVG(t.target_value) as pest_rate,
-               COUNT(*) as inspection_count
-        FROM entities e
-        LEFT JOIN has_inspection_result_edges hir ON e.entity_id = hir.entity_id
-        LEFT JOIN target_proxies t ON hir.target_value = t.target_value
-        GROUP BY e.entity_id
-    """).fetchall()
-
-    # Convert to DataFrame
-    labels_df = pd.DataFrame(entity_labels, columns=['entity_id', 'has_pest_ever', 'pest_rate', 'inspection_count'])
+    labels_df = _fetch_entity_labels(self)
     labels_df['has_pest_ever'] = labels_df['has_pest_ever'].fillna(0)
     labels_df['pest_rate'] = labels_df['pest_rate'].fillna(0.0)
 
@@ -79,52 +138,38 @@ def run_graphsage_pgx(self):
         from pypgx.api.mllib import DeepWalkModel
 
         dw_model = DeepWalkModel()
-        dw_model.set_walk_length(10)
-        dw_model.set_walks_per_vertex(10)
+        dw_model.set_walk_length(walk_length)
+        dw_model.set_walks_per_vertex(walks_per_vertex)
         dw_model.set_embedding_dimension(64)
         dw_model.set_window_size(5)
-        dw_model.set_num_epochs(5)
+        dw_model.set_num_epochs(num_epochs)
+        dw_model.set_num_workers(os.cpu_count())
 
         self.logger.info("Training DeepWalk model...")
         embeddings_map = dw_model.fit_model(self.graph, self.pgx_session)
 
-        # Extract embeddings
+        # Extract embeddings via the cached entity -> vertex map
         self.logger.debug("Extracting entity embeddings...")
-        embedding_data = []
-
-        for idx, row in labels_df.iterrows():
-            entity_id = row['entity_id']
-            vertex = self.graph.get_vertex(entity_id)
-
-            if vertex:
-                emb = embeddings_map.get(vertex)
-                if emb:
-                    embedding_data.append({
-                        'entity_id': entity_id,
-                        'embedding': emb,
-                        'has_pest_ever': row['has_pest_ever'],
-                        'pest_rate': row['pest_rate']
-                    })
-
-        # Convert embeddings to DataFrame
-        self.logger.debug("Converting embeddings to DataFrame format...")
-        entity_ids = [d['entity_id'] for d in embedding_data]
-        embeddings_list = [d['embedding'] for d in embedding_data]
-        has_pest = [d['has_pest_ever'] for d in embedding_data]
-        pest_rates = [d['pest_rate'] for d in embedding_data]
+        vmap = self.get_vertex_map()
+        vertices = [vmap.get(eid) for eid in labels_df['entity_id']]
+        embeddings = [embeddings_map.get(vertex) if vertex else None for vertex in vertices]
+        mask = np.fromiter((emb is not None for emb in embeddings), dtype=bool, count=len(embeddings))
 
-        # Create DataFrame with embeddings
-        embedding_df = pd.DataFrame(embeddings_list)
-        embedding_df.columns = [f'graphwise_dim_{i}' for i in range(len(embedding_df.columns))]
-
-        # Combine all data
-        final_df = pd.DataFrame({
-            'entity_id': entity_ids,
-            'has_pest_ever': has_pest,
-            'pest_rate': pest_rates
-        })
-
-        final_df = pd.concat([final_df, embedding_df], axis=1)
+        # Build the final frame directly; embedding columns are views into
+        # one contiguous float32 array (half the memory of float64)
+        self.logger.debug("Converting embeddings to DataFrame format...")
+        embeddings_list = [emb for emb, keep in zip(embeddings, mask) if keep]
+        emb = np.asarray(embeddings_list, dtype=np.float32)
+
+        labelled = labels_df.loc[mask]
+        data = {
+            'entity_id': labelled['entity_id'].values,
+            'has_pest_ever': labelled['has_pest_ever'].values,
+            'pest_rate': labelled['pest_rate'].values,
+        }
+        for i in range(emb.shape[1] if emb.ndim == 2 else 0):
+            data[f'graphwise_dim_{i}'] = emb[:, i]
+        final_df = pd.DataFrame(data, copy=False)
 
         pest_count = final_df['has_pest_ever'].sum()
         total_entities = len(final_df)
@@ -132,9 +177,7 @@ def run_graphsage_pgx(self):
         self.logger.info(f"Final DataFrame shape: {final_df.shape}")
 
         # Save results
-        output_file = '/app/graphwise_entity_features.csv'
-        final_df.to_csv(output_file, index=False)
-        self.logger.info(f"Graph learning features saved to '{output_file}'")
+        _save_features(self, final_df, '/app/graphwise_entity_features', legacy_csv)
 
         return final_df
 
@@ -143,71 +186,63 @@ def run_graphsage_pgx(self):
         raise
 
 
-def run_graphsage_alternative(self):
+def run_graphsage_alternative(self, legacy_csv=False):
     """
     Alternative approach: Use structural features + labels for pest prediction
 
     This method doesn't use deep learning but provides a feature-rich dataset
     that can be used with traditional ML models (sklearn, xgboost, etc.)
+
+    Args:
+        legacy_csv: Also write a CSV copy of the output (default False)
     """
     self.logger.info("Extracting comprehensive features for pest prediction")
 
     if not self.graph:
         raise ValueError("Graph must be loaded before feature extraction")
 
-    from pypgx.api.analyst import Analyst
-    analyst = Analyst(self.pgx_session)
-
     # Get all entities
-    vertices = self.graph.query_pgql("""
-        SELECT v.entity_id
-        FROM MATCH (v:entities)
-    """).to_pandas()
-
-    entity_df = vertices.rename(columns={'entity_id': 'entity_id'})
-    entity_df['nodeId'] = range(len(entity_df))
+    entity_df = self.get_entity_frame()
 
     # Extract multiple graph features
     self.logger.info("Computing graph features...")
 
-    # PageRank
-    pagerank = analyst.pagerank(self.graph)
-    entity_df['pagerank'] = [pagerank.get(self.graph.get_vertex(eid)) or 0.0 for eid in entity_df['entity_id']]
-
-    # Degree
-    entity_df['degree'] = [self.graph.get_vertex(eid).degree() if self.graph.get_vertex(eid) else 0
-                           for eid in entity_df['entity_id']]
+    # Shared centralities, pulled across in one bulk projection
+    self.get_centralities()
+    features = self.get_vertex_properties(['pagerank', 'degree', 'betweenness', 'lcc'])
 
-    # Betweenness
-    betweenness = analyst.betweenness_centrality(self.graph)
-    entity_df['betweenness'] = [betweenness.get(self.graph.get_vertex(eid)) or 0.0
-                                 for eid in entity_df['entity_id']]
-
-    # Clustering coefficient
-    clustering = analyst.local_clustering_coefficient(self.graph)
-    entity_df['clustering'] = [clustering.get(self.graph.get_vertex(eid)) or 0.0
-                               for eid in entity_df['entity_id']]
+    pagerank = features['pagerank']
+    degree = features['degree'].astype(np.int32)
+    betweenness = features['betweenness']
+    clustering = features['lcc']
 
     # Get pest labels from database
     self.logger.info("Retrieving pest labels...")
-    entity_labels = self.cursor.execute("""
-        SELECT e.entity_id,
-               MAX(t.target_value) as has_pest_ever,
-               AVG(t.target_value) as pest_rate,
-               COUNT(DISTINCT i.inspection_id) as inspection_count
-        FROM entities e
-        LEFT JOIN inspections i ON e.entity_id = i.entity_id
-        LEFT JOIN target_proxies t ON i.target_proxy = t.target_value
-        GROUP BY e.entity_id
-    """).fetchall()
-
-    labels_df = pd.DataFrame(entity_labels, columns=['entity_id', 'has_pest_ever', 'pest_rate', 'inspection_count'])
-
-    # Merge features with labels
-    final_df = pd.merge(entity_df, labels_df, on='entity_id', how='left')
-    final_df['has_pest_ever'] = final_df['has_pest_ever'].fillna(0)
-    final_df['pest_rate'] = final_df['pest_rate'].fillna(0.0)
-    final_df['inspection_count'] = final_df['inspection_count'].fillna(0)
+    labels_df = _fetch_entity_labels(self)
+
+    # Align labels to entities; entities without labels get zeros
+    idx = _align(entity_df['entity_id'].to_numpy(dtype=str), labels_df['entity_id'].to_numpy(dtype=str))
+    found = idx >= 0
+
+    def label_column(name, dtype=np.float32):
+        values = np.zeros(len(idx), dtype=dtype)
+        source = labels_df[name].fillna(0).to_numpy(dtype=dtype)
+        values[found] = source[idx[found]]
+        return values
+
+    data = {
+        'entity_id': entity_df['entity_id'].values,
+        'nodeId': entity_df['nodeId'].values,
+        'pagerank': pagerank,
+        'degree': degree,
+        'betweenness': betweenness,
+        'clustering': clustering,
+    }
+    data.update(_assemble(pagerank, degree, betweenness))
+    data['has_pest_ever'] = label_column('has_pest_ever', np.int8)
+    data['pest_rate'] = label_column('pest_rate')
+    data['inspection_count'] = label_column('inspection_count', np.int32)
+    final_df = pd.DataFrame(data, copy=False)
 
     pest_count = final_df['has_pest_ever'].sum()
     total_entities = len(final_df)
@@ -215,8 +250,6 @@ def run_graphsage_alternative(self):
     self.logger.info(f"Final DataFrame shape: {final_df.shape}")
 
     # Save results
-    output_file = '/app/pest_prediction_features.csv'
-    final_df.to_csv(output_file, index=False)
-    self.logger.info(f"Features saved to '{output_file}'")
+    _save_features(self, final_df, '/app/pest_prediction_features', legacy_csv)
 
     return final_df
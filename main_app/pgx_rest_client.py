@@ -5,9 +5,11 @@ This module provides a simple interface to interact with Oracle Graph Server (PG
 via its REST API, enabling graph analytics and machine learning without pypgx.
 """
 
+import orjson
 import requests
-import json
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 class PGXRestClient:
@@ -21,11 +23,33 @@ class PGXRestClient:
         if username and password:
             self.session.auth = (username, password)
 
+        # Keep connections to the server alive across algorithm calls and retry
+        # transient gateway errors (urllib3 only retries idempotent methods, so
+        # algorithm POSTs are never re-submitted)
+        retry = Retry(total=5, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+    def _request(self, method, path, payload=None):
+        """Send a request (with an orjson-encoded payload, if any) and decode the JSON response"""
+        data = orjson.dumps(payload) if payload is not None else None
+        response = self.session.request(method, f"{self.base_url}{path}", data=data)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    def _post(self, path, payload):
+        """POST a payload and decode the JSON response"""
+        return self._request("POST", path, payload)
+
+    def _get(self, path):
+        """GET a path and decode the JSON response"""
+        return self._request("GET", path)
+
     def get_version(self):
         """Get PGX server version"""
-        response = self.session.get(f"{self.base_url}/version")
-        response.raise_for_status()
-        return response.json()
+        return self._get("/version")
 
     def load_graph_from_database(self, graph_name, jdbc_url, username, password):
         """
@@ -46,13 +70,7 @@ class PGXRestClient:
             "pgql_query": f"SELECT * FROM GRAPH_TABLE ({graph_name} MATCH (v) -[e]-> (w) COLUMNS (v, e, w))"
         }
 
-        response = self.session.post(
-            f"{self.base_url}/graphs",
-            json=config,
-            headers={"Content-Type": "application/json"}
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._post("/graphs", config)
 
     def run_pagerank(self, graph_name, max_iterations=100, tolerance=0.001):
         """Run PageRank algorithm on a graph"""
@@ -65,13 +83,7 @@ class PGXRestClient:
             }
         }
 
-        response = self.session.post(
-            f"{self.base_url}/analytics/algorithms/run",
-            json=payload,
-            headers={"Content-Type": "application/json"}
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._post("/analytics/algorithms/run", payload)
 
     def run_betweenness_centrality(self, graph_name):
         """Run Betweenness Centrality algorithm"""
@@ -80,13 +92,7 @@ class PGXRestClient:
             "graph": graph_name
         }
 
-        response = self.session.post(
-            f"{self.base_url}/analytics/algorithms/run",
-            json=payload,
-            headers={"Content-Type": "application/json"}
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._post("/analytics/algorithms/run", payload)
 
     def run_community_detection(self, graph_name, algorithm="louvain"):
         """Run community detection (Louvain or Label Propagation)"""
@@ -95,13 +101,7 @@ class PGXRestClient:
             "graph": graph_name
         }
 
-        response = self.session.post(
-            f"{self.base_url}/analytics/algorithms/run",
-            json=payload,
-            headers={"Content-Type": "application/json"}
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._post("/analytics/algorithms/run", payload)
 
     def run_deepwalk(self, graph_name, dimensions=64, walk_length=10, walks_per_node=10):
         """Run DeepWalk algorithm for node embeddings"""
@@ -115,13 +115,7 @@ class PGXRestClient:
             }
         }
 
-        response = self.session.post(
-            f"{self.base_url}/analytics/ml/deepwalk",
-            json=payload,
-            headers={"Content-Type": "application/json"}
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._post("/analytics/ml/deepwalk", payload)
 
     def execute_pgql(self, graph_name, query):
         """Execute a PGQL query on a loaded graph"""
@@ -130,31 +124,19 @@ class PGXRestClient:
             "query": query
         }
 
-        response = self.session.post(
-            f"{self.base_url}/pgql/query",
-            json=payload,
-            headers={"Content-Type": "application/json"}
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._post("/pgql/query", payload)
 
     def list_graphs(self):
         """List all loaded graphs"""
-        response = self.session.get(f"{self.base_url}/graphs")
-        response.raise_for_status()
-        return response.json()
+        return self._get("/graphs")
 
     def get_graph_info(self, graph_name):
         """Get information about a specific graph"""
-        response = self.session.get(f"{self.base_url}/graphs/{graph_name}")
-        response.raise_for_status()
-        return response.json()
+        return self._get(f"/graphs/{graph_name}")
 
     def delete_graph(self, graph_name):
         """Delete a graph from PGX"""
-        response = self.session.delete(f"{self.base_url}/graphs/{graph_name}")
-        response.raise_for_status()
-        return response.json()
+        return self._request("DELETE", f"/graphs/{graph_name}")
 
 
 # Example usage functions
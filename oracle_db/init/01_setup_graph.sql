@@ -11,12 +11,20 @@ GRANT CREATE TABLE TO graphuser;
 GRANT CREATE VIEW TO graphuser;
 GRANT CREATE SEQUENCE TO graphuser;
 GRANT CREATE PROCEDURE TO graphuser;
+GRANT CREATE MATERIALIZED VIEW TO graphuser;
 
 -- Grant graph-specific privileges
 GRANT GRAPH_DEVELOPER TO graphuser;
 GRANT PGX_SESSION_CREATE TO graphuser;
 GRANT PGX_SERVER_MANAGE TO graphuser;
 
+-- Server-side CSV export target (./data/export on the host, see docker-compose.yml).
+-- run_graph_analytics.py writes the optional edge list here with UTL_FILE when
+-- EXPORT_EDGE_LIST=true and ORACLE_EXPORT_DIR=GRAPH_EXPORT are set
+CREATE OR REPLACE DIRECTORY graph_export AS '/opt/oracle/export';
+GRANT READ, WRITE ON DIRECTORY graph_export TO graphuser;
+GRANT EXECUTE ON UTL_FILE TO graphuser;
+
 -- Create property graph tables schema
 CREATE TABLE graphuser.entities (
     entity_id VARCHAR2(100) PRIMARY KEY,
@@ -98,13 +106,15 @@ CREATE TABLE graphuser.has_inspection_result_edges (
     CONSTRAINT fk_result_target FOREIGN KEY (target_value) REFERENCES graphuser.target_proxies(target_value)
 );
 
--- Create indexes for performance
-CREATE INDEX idx_insp_entity ON graphuser.inspections(entity_id);
+-- Create indexes for performance. The (entity_id, ...) composites on
+-- inspections and the edge tables are built by the loader after the bulk load
+-- (PestDataAnalyzer.LOAD_INDEXES) and also serve entity_id lookups on those
+-- tables
 CREATE INDEX idx_insp_country ON graphuser.inspections(country_code);
 CREATE INDEX idx_insp_month ON graphuser.inspections(month_name);
-CREATE INDEX idx_ship_entity ON graphuser.shipped_in_edges(entity_id);
-CREATE INDEX idx_from_entity ON graphuser.is_from_edges(entity_id);
-CREATE INDEX idx_weather_entity ON graphuser.has_weather_edges(entity_id);
-CREATE INDEX idx_result_entity ON graphuser.has_inspection_result_edges(entity_id);
+
+-- The entity_pest_labels materialized view is created by the loader
+-- (PestDataAnalyzer.create_label_view), which needs the CREATE MATERIALIZED
+-- VIEW grant above
 
 COMMIT;
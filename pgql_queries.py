@@ -23,150 +23,173 @@ def connect_db():
     print(f"[OK] Connected to Oracle Database")
     return connection
 
-def run_query(connection, query, description):
-    """Run a SQL query and display results"""
-    print(f"\n{description}")
-    print("-" * 60)
+class Analyzer:
+    """Runs the analysis queries on one long-lived, prefetching cursor"""
+
+    def __init__(self, connection, arraysize=1000):
+        self.connection = connection
+        self.cur = connection.cursor()
+        # prefetchrows ships the first batch with the execute response
+        self.cur.arraysize = arraysize
+        self.cur.prefetchrows = arraysize
+
+    def close(self):
+        self.cur.close()
+
+    def run(self, query, description):
+        """Run a SQL query and display results"""
+        print(f"\n{description}")
+        print("-" * 60)
+
+        try:
+            self.cur.execute(query)
+            columns = [d[0] for d in self.cur.description]
+            df = pd.DataFrame.from_records(self.cur.fetchall(), columns=columns)
+            print(df.to_string(index=False))
+            return df
+        except Exception as e:
+            print(f"[ERROR] {e}")
+            return None
+
+    def analyze_graph_structure(self):
+        """Analyze the graph structure"""
 
-    try:
-        df = pd.read_sql(query, connection)
-        print(df.to_string(index=False))
-        return df
-    except Exception as e:
-        print(f"[ERROR] {e}")
-        return None
-
-def analyze_graph_structure(connection):
-    """Analyze the graph structure"""
-
-    print("\n" + "="*60)
-    print("GRAPH STRUCTURE ANALYSIS")
-    print("="*60)
+        print("\n" + "="*60)
+        print("GRAPH STRUCTURE ANALYSIS")
+        print("="*60)
 
-    # Count vertices
-    vertices_query = """
-    SELECT 'ENTITIES' as table_name, COUNT(*) as count FROM entities
-    UNION ALL
-    SELECT 'COUNTRIES', COUNT(*) FROM countries
-    UNION ALL
-    SELECT 'MONTHS', COUNT(*) FROM months
-    UNION ALL
-    SELECT 'INSPECTIONS', COUNT(*) FROM inspections
-    """
-    run_query(connection, vertices_query, "Vertex Counts:")
-
-    # Count edges
-    edges_query = """
-    SELECT 'SHIPPED_IN' as edge_type, COUNT(*) as count FROM shipped_in_edges
-    UNION ALL
-    SELECT 'IS_FROM', COUNT(*) FROM is_from_edges
-    UNION ALL
-    SELECT 'HAS_WEATHER', COUNT(*) FROM has_weather_edges
-    UNION ALL
-    SELECT 'HAS_INSPECTION', COUNT(*) FROM has_inspection_result_edges
-    """
-    run_query(connection, edges_query, "Edge Counts:")
-
-def analyze_node_degrees(connection):
-    """Calculate node degrees (number of connections)"""
-
-    print("\n" + "="*60)
-    print("NODE DEGREE ANALYSIS")
-    print("="*60)
+        # Count vertices
+        vertices_query = """
+        SELECT 'ENTITIES' as table_name, COUNT(*) as count FROM entities
+        UNION ALL
+        SELECT 'COUNTRIES', COUNT(*) FROM countries
+        UNION ALL
+        SELECT 'MONTHS', COUNT(*) FROM months
+        UNION ALL
+        SELECT 'INSPECTIONS', COUNT(*) FROM inspections
+        """
+        self.run(vertices_query, "Vertex Counts:")
+
+        # Count edges
+        edges_query = """
+        SELECT 'SHIPPED_IN' as edge_type, COUNT(*) as count FROM shipped_in_edges
+        UNION ALL
+        SELECT 'IS_FROM', COUNT(*) FROM is_from_edges
+        UNION ALL
+        SELECT 'HAS_WEATHER', COUNT(*) FROM has_weather_edges
+        UNION ALL
+        SELECT 'HAS_INSPECTION', COUNT(*) FROM has_inspection_result_edges
+        """
+        self.run(edges_query, "Edge Counts:")
+
+    def analyze_node_degrees(self):
+        """Calculate node degrees (number of connections)"""
 
-    # Outgoing connections per entity
-    query = """
-    SELECT
-        e.entity_id,
-        e.entity_type,
-        (SELECT COUNT(*) FROM shipped_in_edges WHERE entity_id = e.entity_id) AS shipped_count,
-        (SELECT COUNT(*) FROM is_from_edges WHERE entity_id = e.entity_id) AS country_count,
-        (SELECT COUNT(*) FROM has_weather_edges WHERE entity_id = e.entity_id) AS weather_count,
-        (SELECT COUNT(*) FROM has_inspection_result_edges WHERE entity_id = e.entity_id) AS inspection_count
-    FROM entities e
-    ORDER BY shipped_count DESC
-    FETCH FIRST 10 ROWS ONLY
-    """
-    run_query(connection, query, "Top 10 Entities by Connections:")
-
-def analyze_country_distribution(connection):
-    """Analyze entity distribution by country"""
-
-    print("\n" + "="*60)
-    print("COUNTRY DISTRIBUTION ANALYSIS")
-    print("="*60)
+        print("\n" + "="*60)
+        print("NODE DEGREE ANALYSIS")
+        print("="*60)
 
-    query = """
-    SELECT
-        country_code,
-        COUNT(DISTINCT entity_id) AS entity_count
-    FROM inspections
-    GROUP BY country_code
-    ORDER BY entity_count DESC
-    """
-    run_query(connection, query, "Entities per Country:")
-
-def analyze_temporal_patterns(connection):
-    """Analyze shipping patterns over time"""
-
-    print("\n" + "="*60)
-    print("TEMPORAL PATTERN ANALYSIS")
-    print("="*60)
+        # Outgoing connections per entity
+        query = """
+        SELECT
+            e.entity_id,
+            e.entity_type,
+            COALESCE(s.c, 0) AS shipped_count,
+            COALESCE(f.c, 0) AS country_count,
+            COALESCE(w.c, 0) AS weather_count,
+            COALESCE(i.c, 0) AS inspection_count
+        FROM entities e
+        LEFT JOIN (SELECT entity_id, COUNT(*) c FROM shipped_in_edges GROUP BY entity_id) s
+            ON s.entity_id = e.entity_id
+        LEFT JOIN (SELECT entity_id, COUNT(*) c FROM is_from_edges GROUP BY entity_id) f
+            ON f.entity_id = e.entity_id
+        LEFT JOIN (SELECT entity_id, COUNT(*) c FROM has_weather_edges GROUP BY entity_id) w
+            ON w.entity_id = e.entity_id
+        LEFT JOIN (SELECT entity_id, COUNT(*) c FROM has_inspection_result_edges GROUP BY entity_id) i
+            ON i.entity_id = e.entity_id
+        ORDER BY shipped_count DESC
+        FETCH FIRST 10 ROWS ONLY
+        """
+        self.run(query, "Top 10 Entities by Connections:")
+
+    def analyze_country_distribution(self):
+        """Analyze entity distribution by country"""
 
-    query = """
-    SELECT
-        month_name,
-        COUNT(DISTINCT entity_id) AS entity_count,
-        COUNT(*) AS shipment_count
-    FROM shipped_in_edges
-    GROUP BY month_name
-    ORDER BY shipment_count DESC
-    """
-    run_query(connection, query, "Shipments by Month:")
-
-def analyze_inspection_results(connection):
-    """Analyze inspection results"""
-
-    print("\n" + "="*60)
-    print("INSPECTION RESULTS ANALYSIS")
-    print("="*60)
+        print("\n" + "="*60)
+        print("COUNTRY DISTRIBUTION ANALYSIS")
+        print("="*60)
 
-    query = """
-    SELECT
-        CASE WHEN has_pest = 1 THEN 'HAS_PEST' ELSE 'NO_PEST' END AS result,
-        COUNT(*) AS count,
-        ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER (), 2) AS percentage
-    FROM inspections
-    GROUP BY has_pest
-    ORDER BY count DESC
-    """
-    run_query(connection, query, "Inspection Results Distribution:")
-
-def find_high_risk_entities(connection):
-    """Find entities with high pest detection rates"""
-
-    print("\n" + "="*60)
-    print("HIGH RISK ENTITIES")
-    print("="*60)
+        query = """
+        SELECT
+            country_code,
+            COUNT(DISTINCT entity_id) AS entity_count
+        FROM inspections
+        GROUP BY country_code
+        ORDER BY entity_count DESC
+        """
+        self.run(query, "Entities per Country:")
+
+    def analyze_temporal_patterns(self):
+        """Analyze shipping patterns over time"""
 
-    query = """
-    SELECT
-        i.entity_id,
-        e.entity_type,
-        COUNT(*) AS inspection_count,
-        SUM(i.has_pest) AS pest_count,
-        ROUND(SUM(i.has_pest) * 100.0 / COUNT(*), 2) AS pest_percentage,
-        ROUND(AVG(i.pests_30d), 2) AS avg_pests_30d,
-        ROUND(AVG(i.pests_90d), 2) AS avg_pests_90d,
-        ROUND(AVG(i.pests_1yr), 2) AS avg_pests_1yr
-    FROM inspections i
-    JOIN entities e ON i.entity_id = e.entity_id
-    GROUP BY i.entity_id, e.entity_type
-    HAVING COUNT(*) >= 1
-    ORDER BY avg_pests_1yr DESC, avg_pests_90d DESC
-    FETCH FIRST 10 ROWS ONLY
-    """
-    run_query(connection, query, "Top 10 Entities by Pest Detection Rate:")
+        print("\n" + "="*60)
+        print("TEMPORAL PATTERN ANALYSIS")
+        print("="*60)
+
+        query = """
+        SELECT
+            month_name,
+            COUNT(DISTINCT entity_id) AS entity_count,
+            COUNT(*) AS shipment_count
+        FROM shipped_in_edges
+        GROUP BY month_name
+        ORDER BY shipment_count DESC
+        """
+        self.run(query, "Shipments by Month:")
+
+    def analyze_inspection_results(self):
+        """Analyze inspection results"""
+
+        print("\n" + "="*60)
+        print("INSPECTION RESULTS ANALYSIS")
+        print("="*60)
+
+        query = """
+        SELECT
+            CASE WHEN has_pest = 1 THEN 'HAS_PEST' ELSE 'NO_PEST' END AS result,
+            COUNT(*) AS count,
+            ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER (), 2) AS percentage
+        FROM inspections
+        GROUP BY has_pest
+        ORDER BY count DESC
+        """
+        self.run(query, "Inspection Results Distribution:")
+
+    def find_high_risk_entities(self):
+        """Find entities with high pest detection rates"""
+
+        print("\n" + "="*60)
+        print("HIGH RISK ENTITIES")
+        print("="*60)
+
+        query = """
+        SELECT
+            i.entity_id,
+            e.entity_type,
+            COUNT(*) AS inspection_count,
+            SUM(i.has_pest) AS pest_count,
+            ROUND(SUM(i.has_pest) * 100.0 / COUNT(*), 2) AS pest_percentage,
+            ROUND(AVG(i.pests_30d), 2) AS avg_pests_30d,
+            ROUND(AVG(i.pests_90d), 2) AS avg_pests_90d,
+            ROUND(AVG(i.pests_1yr), 2) AS avg_pests_1yr
+        FROM inspections i
+        JOIN entities e ON i.entity_id = e.entity_id
+        GROUP BY i.entity_id, e.entity_type
+        HAVING COUNT(*) >= 1
+        ORDER BY avg_pests_1yr DESC, avg_pests_90d DESC
+        FETCH FIRST 10 ROWS ONLY
+        """
+        self.run(query, "Top 10 Entities by Pest Detection Rate:")
 
 if __name__ == "__main__":
     print("="*60)
@@ -176,19 +199,22 @@ if __name__ == "__main__":
     # Connect to database
     connection = connect_db()
 
+    analyzer = Analyzer(connection)
+
     try:
         # Run all analyses
-        analyze_graph_structure(connection)
-        analyze_node_degrees(connection)
-        analyze_country_distribution(connection)
-        analyze_temporal_patterns(connection)
-        analyze_inspection_results(connection)
-        find_high_risk_entities(connection)
+        analyzer.analyze_graph_structure()
+        analyzer.analyze_node_degrees()
+        analyzer.analyze_country_distribution()
+        analyzer.analyze_temporal_patterns()
+        analyzer.analyze_inspection_results()
+        analyzer.find_high_risk_entities()
 
         print("\n" + "="*60)
         print("ANALYSIS COMPLETE")
         print("="*60)
 
     finally:
+        analyzer.close()
         connection.close()
         print("\n[OK] Database connection closed")